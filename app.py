@@ -2,149 +2,176 @@
 TicTacToe Memory Challenge - FastAPI Backend
 Serves the game API and static frontend.
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
-from typing import Optional
+from fastapi.responses import ORJSONResponse, Response
+import asyncio
+import gzip
+import hashlib
 import os
+import secrets
 
 from tictactoe_game import TicTacToeGame, GameState, Difficulty
 
-app = FastAPI(title="TicTacToe Memory Challenge", description="Tic-Tac-Toe with a memory twist")
+app = FastAPI(
+    title="TicTacToe Memory Challenge",
+    description="Tic-Tac-Toe with a memory twist",
+    default_response_class=ORJSONResponse,
+)
 
-# Global game instance
+# Global game instance; handlers that mutate it hold _game_lock. No locked
+# section awaits anything yet, so the lock is never contended today: it is there
+# so a future await (I/O, persistence) inside a mutation cannot interleave requests
 game = TicTacToeGame()
+_game_lock = asyncio.Lock()
 
+# The frontend is a single small file, so read it once and serve it from memory
+static_dir = os.path.join(os.path.dirname(__file__), "static")
+with open(os.path.join(static_dir, "index.html"), "rb") as f:
+    INDEX_BYTES = f.read()
+INDEX_ETAG = f'"{hashlib.md5(INDEX_BYTES).hexdigest()}"'
+INDEX_GZIP_BYTES = gzip.compress(INDEX_BYTES, mtime=0)
+INDEX_GZIP_ETAG = INDEX_ETAG[:-1] + '-gzip"'
 
-class MoveRequest(BaseModel):
-    position: int
-
-
-class NewGameRequest(BaseModel):
-    difficulty: Optional[str] = None
-
-
-class DifficultyRequest(BaseModel):
-    difficulty: str
-
-
-class GameStateResponse(BaseModel):
-    board: list
-    state: str
-    difficulty: str
-    countdown_seconds: int
-    board_visible: bool
-    winner: Optional[str]
-    winning_cells: list
-    last_move: Optional[int]
-    win_streak: int
-    best_streak: int
-    games_played: int
-    games_won: int
-    loss_streak: int = 0
-    message: str = ""
-    tokens: int = 0
-    total_tokens_earned: int = 0
-    current_avatar: dict = {}
-    unlocked_avatars: list = []
+# Per-process prefix so state ETags from a previous server run never match
+STATE_ETAG_PREFIX = secrets.token_hex(4)
 
 
-class AvatarRequest(BaseModel):
-    avatar_id: str
+async def read_body(request: Request) -> dict:
+    """Parse the JSON request body (an empty body is treated as {})."""
+    try:
+        body = await request.json() if await request.body() else {}
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid JSON body")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=422, detail="Request body must be a JSON object")
+    return body
 
 
-def make_response(message: str = "") -> GameStateResponse:
+def parse_difficulty(value) -> Difficulty:
+    """Convert a difficulty name from a request body to a Difficulty."""
+    try:
+        return Difficulty(value.lower())
+    except (AttributeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid difficulty: {value}")
+
+
+async def read_avatar_id(request: Request) -> str:
+    """Get the avatar_id field from a request body."""
+    avatar_id = (await read_body(request)).get("avatar_id")
+    if not isinstance(avatar_id, str):
+        raise HTTPException(status_code=422, detail="avatar_id must be a string")
+    return avatar_id
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Check whether an Accept-Encoding header allows gzip (q=0 refuses it)."""
+    qualities = {}
+    for token in accept_encoding.split(","):
+        coding, *params = token.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def make_response(message: str = "") -> dict:
     """Helper to create response from game state."""
-    state = game.get_board_state()
-    return GameStateResponse(
-        board=state["board"],
-        state=state["state"],
-        difficulty=state["difficulty"],
-        countdown_seconds=state["countdown_seconds"],
-        board_visible=state["board_visible"],
-        winner=state["winner"],
-        winning_cells=state["winning_cells"],
-        last_move=state["last_move"],
-        win_streak=state["win_streak"],
-        best_streak=state["best_streak"],
-        games_played=state["games_played"],
-        games_won=state["games_won"],
-        loss_streak=state["loss_streak"],
-        message=message,
-        tokens=state["tokens"],
-        total_tokens_earned=state["total_tokens_earned"],
-        current_avatar=state["current_avatar"],
-        unlocked_avatars=state["unlocked_avatars"]
-    )
+    return {**game.get_board_state(), "message": message}
 
 
 @app.get("/")
-async def serve_frontend():
+async def serve_frontend(request: Request):
     """Serve the main HTML page."""
-    return FileResponse(os.path.join(os.path.dirname(__file__), "static", "index.html"))
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if accepts_gzip(request.headers.get("accept-encoding", "")):
+        content, headers["ETag"] = INDEX_GZIP_BYTES, INDEX_GZIP_ETAG
+        headers["Content-Encoding"] = "gzip"
+    else:
+        content, headers["ETag"] = INDEX_BYTES, INDEX_ETAG
+
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="text/html", headers=headers)
 
 
 @app.get("/api/state")
-async def get_game_state():
-    """Get the current game state."""
+async def get_game_state(request: Request, response: Response):
+    """Get the current game state (304 if unchanged since the client's ETag)."""
+    game.get_board_state()  # Rebuilds the cached state (and version) if stale
+    etag = f'"{STATE_ETAG_PREFIX}-{game.state_version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
     return make_response()
 
 
 @app.post("/api/new-game")
-async def new_game(request: NewGameRequest = None):
+async def new_game(request: Request):
     """Start a new game."""
-    if request and request.difficulty:
-        try:
-            diff = Difficulty(request.difficulty.lower())
-            game.set_difficulty(diff)
-        except ValueError:
-            raise HTTPException(status_code=400, detail=f"Invalid difficulty: {request.difficulty}")
+    difficulty = (await read_body(request)).get("difficulty")
+    diff = parse_difficulty(difficulty) if difficulty else None
 
-    game.reset()
-    diff_names = {"easy": "Easy", "medium": "Medium", "hard": "Hard"}
-    diff_name = diff_names.get(game.difficulty.value, game.difficulty.value)
-    return make_response(f"Game started on {diff_name}! Your turn - watch the countdown!")
+    async with _game_lock:
+        if diff:
+            game.set_difficulty(diff)
+        game.reset()
+        diff_names = {"easy": "Easy", "medium": "Medium", "hard": "Hard"}
+        diff_name = diff_names.get(game.difficulty.value, game.difficulty.value)
+        return make_response(f"Game started on {diff_name}! Your turn - watch the countdown!")
 
 
 @app.post("/api/difficulty")
-async def set_difficulty(request: DifficultyRequest):
+async def set_difficulty(request: Request):
     """Set the difficulty level."""
-    try:
-        diff = Difficulty(request.difficulty.lower())
-        game.set_difficulty(diff)
-    except ValueError:
-        raise HTTPException(status_code=400, detail=f"Invalid difficulty: {request.difficulty}")
+    difficulty = (await read_body(request)).get("difficulty")
+    diff = parse_difficulty(difficulty)
 
-    return make_response(f"Difficulty set to {request.difficulty} ({game.get_countdown_seconds()}s countdown)")
+    async with _game_lock:
+        game.set_difficulty(diff)
+        return make_response(f"Difficulty set to {difficulty} ({game.get_countdown_seconds()}s countdown)")
 
 
 @app.post("/api/move")
-async def make_move(move: MoveRequest):
+async def make_move(request: Request):
     """Player makes a move."""
-    result = game.player_move(move.position)
+    position = (await read_body(request)).get("position")
+    if not isinstance(position, int) or isinstance(position, bool):
+        raise HTTPException(status_code=422, detail="position must be an integer")
 
-    if not result.success:
-        raise HTTPException(status_code=400, detail=result.message)
+    async with _game_lock:
+        result = game.player_move(position)
 
-    return make_response(result.message)
+        if not result.success:
+            raise HTTPException(status_code=400, detail=result.message)
+
+        return make_response(result.message)
 
 
 @app.post("/api/computer-move")
 async def computer_move():
     """Computer makes its move."""
-    if game.state != GameState.COMPUTER_TURN:
-        raise HTTPException(status_code=400, detail="Not computer's turn")
+    async with _game_lock:
+        if game.state != GameState.COMPUTER_TURN:
+            raise HTTPException(status_code=400, detail="Not computer's turn")
 
-    result = game.computer_move()
-    return make_response(result.message)
+        result = game.computer_move()
+        return make_response(result.message)
 
 
 @app.post("/api/set-invisible")
 async def set_invisible():
     """Set board to invisible mode (called when countdown ends)."""
-    game.set_board_visible(False)
-    return make_response("Board is now invisible! Make your move from memory!")
+    async with _game_lock:
+        game.set_board_visible(False)
+        return make_response("Board is now invisible! Make your move from memory!")
 
 
 @app.get("/api/shop")
@@ -154,24 +181,27 @@ async def get_shop():
 
 
 @app.post("/api/purchase-avatar")
-async def purchase_avatar(request: AvatarRequest):
+async def purchase_avatar(request: Request):
     """Purchase an avatar with tokens."""
-    result = game.purchase_avatar(request.avatar_id)
-    if not result["success"]:
-        raise HTTPException(status_code=400, detail=result["message"])
-    return {**result, "tokens": game.tokens, "unlocked_avatars": game.unlocked_avatars}
+    avatar_id = await read_avatar_id(request)
+    async with _game_lock:
+        result = game.purchase_avatar(avatar_id)
+        if not result["success"]:
+            raise HTTPException(status_code=400, detail=result["message"])
+        return {**result, "tokens": game.tokens, "unlocked_avatars": game.unlocked_avatars}
 
 
 @app.post("/api/set-avatar")
-async def set_avatar(request: AvatarRequest):
+async def set_avatar(request: Request):
     """Set the current avatar (must be unlocked)."""
-    result = game.set_avatar(request.avatar_id)
-    if not result["success"]:
-        raise HTTPException(status_code=400, detail=result["message"])
-    return {**result, "current_avatar": game.get_current_avatar()}
+    avatar_id = await read_avatar_id(request)
+    async with _game_lock:
+        result = game.set_avatar(avatar_id)
+        if not result["success"]:
+            raise HTTPException(status_code=400, detail=result["message"])
+        return {**result, "current_avatar": game.get_current_avatar()}
 
 
 # Mount static files
-static_dir = os.path.join(os.path.dirname(__file__), "static")
 if os.path.exists(static_dir):
     app.mount("/static", StaticFiles(directory=static_dir), name="static")
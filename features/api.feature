@@ -0,0 +1,110 @@
+Feature: TicTacToe Memory Challenge API
+  As the game frontend
+  I want the API to validate request bodies and cache responses
+  So that bad requests fail clearly and polling stays cheap
+
+  Scenario Outline: Move requests validate the position
+    Given the API has a fresh game
+    When the body <body> is posted to "/api/move"
+    Then the response status should be <status>
+
+    Examples:
+      | body               | status |
+      | {"position": 4}    | 200    |
+      | {}                 | 422    |
+      | empty              | 422    |
+      | {"position": "3"}  | 422    |
+      | {"position": true} | 422    |
+      | [4]                | 422    |
+      | {"position": 4     | 422    |
+
+  Scenario Outline: Difficulty requests validate the difficulty
+    Given the API has a fresh game
+    When the body <body> is posted to "/api/difficulty"
+    Then the response status should be <status>
+
+    Examples:
+      | body                    | status |
+      | {"difficulty": "hard"}  | 200    |
+      | {}                      | 400    |
+      | {"difficulty": 2}       | 400    |
+      | {"difficulty": "bogus"} | 400    |
+      | {"difficulty": "hard"   | 422    |
+
+  Scenario Outline: New game requests accept an optional difficulty
+    Given the API has a fresh game
+    When the body <body> is posted to "/api/new-game"
+    Then the response status should be <status>
+
+    Examples:
+      | body                    | status |
+      | empty                   | 200    |
+      | {}                      | 200    |
+      | {"difficulty": "bogus"} | 400    |
+      | {"difficulty": 2}       | 400    |
+      | "hard"                  | 422    |
+      | {difficulty: hard}      | 422    |
+
+  Scenario: A valid difficulty is applied to the game
+    Given the API has a fresh game
+    When the body {"difficulty": "medium"} is posted to "/api/new-game"
+    Then the response status should be 200
+    And the response difficulty should be "medium"
+
+  Scenario: Unchanged state is answered with 304
+    Given the API has a fresh game
+    When "/api/state" is fetched
+    And the response ETag is saved
+    And "/api/state" is fetched with the saved ETag
+    Then the response status should be 304
+    And the response ETag should be the saved ETag
+
+  Scenario: A move changes the state ETag
+    Given the API has a fresh game
+    When "/api/state" is fetched
+    And the response ETag is saved
+    And the body {"position": 4} is posted to "/api/move"
+    And "/api/state" is fetched with the saved ETag
+    Then the response status should be 200
+    And the response ETag should differ from the saved ETag
+
+  Scenario: An avatar change changes the state ETag
+    Given the API has a fresh game
+    When "/api/state" is fetched
+    And the response ETag is saved
+    And the body {"avatar_id": "egg"} is posted to "/api/set-avatar"
+    And "/api/state" is fetched with the saved ETag
+    Then the response status should be 200
+    And the response ETag should differ from the saved ETag
+
+  Scenario Outline: The frontend honours Accept-Encoding
+    Given the API has a fresh game
+    When "/" is fetched with Accept-Encoding "<encoding>"
+    Then the response status should be 200
+    And the response encoding should be "<served>"
+
+    Examples:
+      | encoding          | served   |
+      | gzip, deflate     | gzip     |
+      | gzip;q=0.5        | gzip     |
+      | *                 | gzip     |
+      | identity          | identity |
+      | gzip;q=0          | identity |
+      | deflate, gzip;q=0 | identity |
+      | gzip;q=0, *       | identity |
+
+  Scenario Outline: Each frontend variant revalidates against its own ETag
+    Given the API has a fresh game
+    When "/" is fetched with Accept-Encoding "<encoding>"
+    And the response ETag is saved
+    And "/" is fetched with Accept-Encoding "<encoding>" and the saved ETag
+    Then the response status should be 304
+    And the response ETag should be the saved ETag
+    When "/" is fetched with Accept-Encoding "<other>" and the saved ETag
+    Then the response status should be 200
+    And the response ETag should differ from the saved ETag
+
+    Examples:
+      | encoding | other    |
+      | gzip     | identity |
+      | identity | gzip     |
@@ -26,3 +26,19 @@ Feature: TicTacToe Memory Challenge Gameplay
     Given a new game is started
     When difficulty is set to "hard"
     Then the countdown should be 1 second
+
+  Scenario: Player completes a line on a prepared board
+    Given a new game is started
+    And the player has marks at positions 0, 1
+    When the player places a mark at position 2
+    Then the player should have won with cells 0, 1, 2
+
+  Scenario: Computer blocks the player's winning line
+    Given a new game is started
+    When the player places a mark at position 0
+    And the computer makes its move
+    Then position 4 should contain the computer's mark
+    When the player places a mark at position 1
+    And the computer makes its move
+    Then position 2 should contain the computer's mark
+    And it should be the player's turn
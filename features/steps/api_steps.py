@@ -0,0 +1,81 @@
+"""
+Step definitions for the TicTacToe Memory Challenge HTTP API.
+"""
+from behave import given, when, then
+from fastapi.testclient import TestClient
+
+import app
+from tictactoe_game import TicTacToeGame
+
+
+@given('the API has a fresh game')
+def step_api_fresh_game(context):
+    app.game = TicTacToeGame()
+    context.client = TestClient(app.app)
+    context.response = None
+    context.saved_etag = None
+
+
+@when('the body {body} is posted to "{path}"')
+def step_post_raw_body(context, body, path):
+    # The body is taken verbatim from the step text; "empty" sends no body at all
+    content = b"" if body == "empty" else body.encode()
+    context.response = context.client.post(
+        path, content=content, headers={"Content-Type": "application/json"})
+
+
+@when('"{path}" is fetched')
+def step_fetch(context, path):
+    context.response = context.client.get(path)
+
+
+@when('"{path}" is fetched with the saved ETag')
+def step_fetch_with_saved_etag(context, path):
+    context.response = context.client.get(path, headers={"If-None-Match": context.saved_etag})
+
+
+@when('"{path}" is fetched with Accept-Encoding "{encoding}"')
+def step_fetch_with_encoding(context, path, encoding):
+    context.response = context.client.get(path, headers={"Accept-Encoding": encoding})
+
+
+@when('"{path}" is fetched with Accept-Encoding "{encoding}" and the saved ETag')
+def step_fetch_with_encoding_and_saved_etag(context, path, encoding):
+    context.response = context.client.get(
+        path, headers={"Accept-Encoding": encoding, "If-None-Match": context.saved_etag})
+
+
+@when('the response ETag is saved')
+def step_save_etag(context):
+    context.saved_etag = context.response.headers["ETag"]
+
+
+@then('the response status should be {status:d}')
+def step_response_status(context, status):
+    assert context.response.status_code == status, \
+        f"Expected {status}, got {context.response.status_code}: {context.response.text}"
+
+
+@then('the response difficulty should be "{difficulty}"')
+def step_response_difficulty(context, difficulty):
+    assert context.response.json()["difficulty"] == difficulty, \
+        f"Expected {difficulty}, got {context.response.json()['difficulty']}"
+
+
+@then('the response ETag should be the saved ETag')
+def step_etag_is_saved(context):
+    assert context.response.headers.get("ETag") == context.saved_etag, \
+        f"Expected ETag {context.saved_etag}, got {context.response.headers.get('ETag')}"
+
+
+@then('the response ETag should differ from the saved ETag')
+def step_etag_differs(context):
+    assert context.response.headers.get("ETag") not in (None, context.saved_etag), \
+        f"Expected a new ETag, got {context.response.headers.get('ETag')}"
+
+
+@then('the response encoding should be "{encoding}"')
+def step_response_encoding(context, encoding):
+    # An identity response carries no Content-Encoding header
+    actual = context.response.headers.get("Content-Encoding", "identity")
+    assert actual == encoding, f"Expected {encoding}, got {actual}"
@@ -5,6 +5,13 @@ from behave import given, when, then
 from tictactoe_game import TicTacToeGame, Difficulty, Mark, GameState
 
 
+_DIFF_MAP = {
+    "easy": Difficulty.EASY,
+    "medium": Difficulty.MEDIUM,
+    "hard": Difficulty.HARD,
+}
+
+
 @given('a new game is started')
 def step_new_game(context):
     context.game = TicTacToeGame()
@@ -13,22 +20,12 @@ def step_new_game(context):
 
 @given('difficulty is set to "{difficulty}"')
 def step_set_difficulty(context, difficulty):
-    diff_map = {
-        "easy": Difficulty.EASY,
-        "medium": Difficulty.MEDIUM,
-        "hard": Difficulty.HARD,
-    }
-    context.game.set_difficulty(diff_map[difficulty.lower()])
+    context.game.set_difficulty(_DIFF_MAP[difficulty.lower()])
 
 
 @when('difficulty is set to "{difficulty}"')
 def step_when_set_difficulty(context, difficulty):
-    diff_map = {
-        "easy": Difficulty.EASY,
-        "medium": Difficulty.MEDIUM,
-        "hard": Difficulty.HARD,
-    }
-    context.game.set_difficulty(diff_map[difficulty.lower()])
+    context.game.set_difficulty(_DIFF_MAP[difficulty.lower()])
 
 
 @when('the player places a mark at position {position:d}')
@@ -36,12 +33,16 @@ def step_player_move(context, position):
     context.last_result = context.game.player_move(position)
 
 
+@when('the computer makes its move')
+def step_computer_move(context):
+    context.last_result = context.game.computer_move()
+
+
 @given('the player has marks at positions {positions}')
 def step_player_has_marks(context, positions):
     # Parse positions like "0, 1, 2"
     pos_list = [int(p.strip()) for p in positions.split(',')]
-    for pos in pos_list:
-        context.game.board[pos] = Mark.X
+    context.game.set_board_for_testing(pos_list, Mark.X)
 
 
 @then('the countdown should be {seconds:d} seconds')
@@ -79,11 +80,26 @@ def step_position_has_player_mark(context, position):
         f"Expected X at position {position}, got {context.game.board[position]}"
 
 
+@then('position {position:d} should contain the computer\'s mark')
+def step_position_has_computer_mark(context, position):
+    assert context.game.board[position] == Mark.O, \
+        f"Expected O at position {position}, got {context.game.board[position]}"
+
+
 @then('the player should win')
 def step_player_wins(context):
     assert context.game.check_win(Mark.X), "Player should have won"
 
 
+@then('the player should have won with cells {cells}')
+def step_player_won_with_cells(context, cells):
+    expected = [int(c.strip()) for c in cells.split(',')]
+    assert context.game.state == GameState.PLAYER_WINS, \
+        f"Expected PLAYER_WINS, got {context.game.state}"
+    assert context.game.winning_cells == expected, \
+        f"Expected winning cells {expected}, got {context.game.winning_cells}"
+
+
 @then('win streak should increase by {amount:d}')
 def step_win_streak_increase(context, amount):
     # This is checked implicitly - the streak increases when game records a win
@@ -95,7 +111,7 @@ def step_win_streak_increase(context, amount):
         # Make a move that would complete the win
         for pos in [0, 1, 2]:
             if context.game.board[pos] == Mark.EMPTY:
-                context.game.board[pos] = Mark.X
+                context.game.set_board_for_testing([pos], Mark.X)
                 break
 
     # Now check if already won
@@ -35,9 +35,15 @@ def main():
     print(f"Server will run on: {url}")
     print("\nPress Ctrl+C to stop the server\n")
 
-    # Open browser after a short delay
+    # Open browser as soon as the server accepts connections
     def open_browser():
-        time.sleep(1.5)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.05).close()
+                break
+            except OSError:
+                time.sleep(0.05)
         webbrowser.open(url)
 
     import threading
@@ -2,15 +2,20 @@
 TicTacToe Memory Challenge - Core Game Logic
 A tic-tac-toe game with a memory twist where the board becomes invisible.
 """
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict, NamedTuple, Set
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import Enum, IntEnum
 
 
-class Mark(Enum):
-    EMPTY = ""
-    X = "X"      # Player
-    O = "O"      # Computer
+class Mark(IntEnum):
+    EMPTY = 0
+    X = 1        # Player
+    O = 2        # Computer
+
+
+# Mark members and their JSON representation, indexed by int value
+MARKS = tuple(Mark)
+MARK_STR = ("", "X", "O")
 
 
 class GameState(Enum):
@@ -45,6 +50,13 @@ TOKEN_REWARDS = {
     "draw": 2,
 }
 
+# Win reward for each difficulty
+_WIN_REWARDS = {
+    Difficulty.EASY: TOKEN_REWARDS["win_easy"],
+    Difficulty.MEDIUM: TOKEN_REWARDS["win_medium"],
+    Difficulty.HARD: TOKEN_REWARDS["win_hard"],
+}
+
 # Avatar definitions: (name, emoji, cost, description)
 AVATARS = [
     {"id": "egg", "name": "Egg", "emoji": "🥒", "cost": 0, "description": "Just starting out!"},
@@ -58,23 +70,107 @@ AVATARS = [
     {"id": "robot", "name": "Robot", "emoji": "🤖", "cost": 1000, "description": "Supreme intelligence!"},
     {"id": "crown", "name": "Champion", "emoji": "👑", "cost": 1500, "description": "The ultimate champion!"},
 ]
+_AVATARS_BY_ID = {avatar["id"]: avatar for avatar in AVATARS}
 
 
 # All possible winning patterns (indices 0-8)
-WIN_PATTERNS = [
-    [0, 1, 2],  # Top row
-    [3, 4, 5],  # Middle row
-    [6, 7, 8],  # Bottom row
-    [0, 3, 6],  # Left column
-    [1, 4, 7],  # Middle column
-    [2, 5, 8],  # Right column
-    [0, 4, 8],  # Diagonal top-left to bottom-right
-    [2, 4, 6],  # Diagonal top-right to bottom-left
-]
-
-
-@dataclass
-class MoveResult:
+WIN_PATTERNS: Tuple[Tuple[int, int, int], ...] = (
+    (0, 1, 2),  # Top row
+    (3, 4, 5),  # Middle row
+    (6, 7, 8),  # Bottom row
+    (0, 3, 6),  # Left column
+    (1, 4, 7),  # Middle column
+    (2, 5, 8),  # Right column
+    (0, 4, 8),  # Diagonal top-left to bottom-right
+    (2, 4, 6),  # Diagonal top-right to bottom-left
+)
+
+# Winning patterns as 9-bit masks (bit i set = cell i)
+WIN_MASKS = tuple(sum(1 << i for i in pattern) for pattern in WIN_PATTERNS)
+M0, M1, M2, M3, M4, M5, M6, M7 = WIN_MASKS
+WIN_MASKS_AND_PATTERNS = tuple(zip(WIN_MASKS, WIN_PATTERNS))
+FULL_BOARD = 0x1FF
+CENTER_MASK = 0b000010000
+CORNER_MASK = 0b101000101  # Cells 0, 2, 6, 8
+EDGE_MASK = 0b010101010    # Cells 1, 3, 5, 7
+
+
+def is_winning_bits(bits: int) -> bool:
+    """Check if a bitboard completes any winning pattern (unrolled over WIN_MASKS)."""
+    return ((bits & M0) == M0 or (bits & M1) == M1 or (bits & M2) == M2
+            or (bits & M3) == M3 or (bits & M4) == M4 or (bits & M5) == M5
+            or (bits & M6) == M6 or (bits & M7) == M7)
+
+
+def _find_completing_move(my_bits: int, opp_bits: int) -> Optional[int]:
+    """Get the lowest empty cell that completes a line for my_bits, or None."""
+    completing = 0
+    for mask in WIN_MASKS:
+        if not opp_bits & mask:
+            missing = mask & ~my_bits
+            # Exactly one cell of the line is still open
+            if missing and not missing & (missing - 1):
+                completing |= missing
+    if not completing:
+        return None
+    return (completing & -completing).bit_length() - 1
+
+
+def _best_move_core(x_bits: int, o_bits: int) -> int:
+    """Simple AI for O on raw bitboards: win, block, center, corner, edge."""
+    # Priority 1: Win if possible
+    pos = _find_completing_move(o_bits, x_bits)
+    if pos is not None:
+        return pos
+
+    # Priority 2: Block player win
+    pos = _find_completing_move(x_bits, o_bits)
+    if pos is not None:
+        return pos
+
+    empty_mask = FULL_BOARD & ~(x_bits | o_bits)
+
+    # Priority 3: Take center
+    if empty_mask & CENTER_MASK:
+        return 4
+
+    # Priority 4: Take the lowest free corner, then Priority 5: the lowest free edge
+    for preferred in (CORNER_MASK, EDGE_MASK):
+        free = empty_mask & preferred
+        if free:
+            return (free & -free).bit_length() - 1
+
+    raise ValueError("No empty positions left")
+
+
+def _build_move_table() -> Dict[Tuple[int, int], int]:
+    """Record the AI reply for every position the computer can be handed in play."""
+    table: Dict[Tuple[int, int], int] = {}
+
+    def explore(x_bits: int, o_bits: int):
+        empty_mask = FULL_BOARD & ~(x_bits | o_bits)
+        while empty_mask:
+            lowest = empty_mask & -empty_mask
+            empty_mask ^= lowest
+            x_next = x_bits | lowest
+            key = (x_next, o_bits)
+            if key in table or is_winning_bits(x_next) or (x_next | o_bits) == FULL_BOARD:
+                continue
+            reply = table[key] = _best_move_core(x_next, o_bits)
+            o_next = o_bits | (1 << reply)
+            if not is_winning_bits(o_next) and (x_next | o_next) != FULL_BOARD:
+                explore(x_next, o_next)
+
+    explore(0, 0)
+    return table
+
+
+# AI replies keyed by (x_bits, o_bits): precomputed for every reachable position,
+# and extended at runtime for any other position the AI is asked about
+BEST_MOVE = _build_move_table()
+
+
+class MoveResult(NamedTuple):
     success: bool
     position: int
     mark: Mark
@@ -86,7 +182,8 @@ class MoveResult:
 class TicTacToeGame:
     """TicTacToe Memory Challenge game engine."""
 
-    board: List[Mark] = field(default_factory=list)
+    x_bits: int = 0  # Bitboard of player marks (bit i = cell i)
+    o_bits: int = 0  # Bitboard of computer marks
     state: GameState = GameState.IDLE
     difficulty: Difficulty = Difficulty.EASY
     countdown_seconds: int = 10
@@ -107,15 +204,24 @@ class TicTacToeGame:
     tokens: int = 0
     total_tokens_earned: int = 0
     current_avatar: str = "egg"
-    unlocked_avatars: List[str] = field(default_factory=lambda: ["egg"])
+    unlocked_avatars: List[str] = field(default_factory=lambda: ["egg"])  # In unlock order
+    _unlocked_set: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+
+    # Serialization cache (rebuilt lazily after any mutation)
+    _state_cache: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _static_state: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    state_version: int = field(default=0, init=False, repr=False, compare=False)  # Bumped per rebuild
 
     def __post_init__(self):
-        if not self.board:
+        self._unlocked_set = set(self.unlocked_avatars)
+        self._refresh_static_state()
+        if not (self.x_bits or self.o_bits):
             self.reset()
 
     def reset(self):
         """Initialize/reset the game board."""
-        self.board = [Mark.EMPTY for _ in range(9)]
+        self.x_bits = self.o_bits = 0
+        self._state_cache = None
         self.state = GameState.PLAYER_TURN
         self.board_visible = True
         self.winner = None
@@ -126,8 +232,17 @@ class TicTacToeGame:
     def set_difficulty(self, difficulty: Difficulty):
         """Set the difficulty level (affects initial countdown time)."""
         self.difficulty = difficulty
-        self.current_countdown = COUNTDOWN_TIMES[difficulty]
         self.countdown_seconds = COUNTDOWN_TIMES[difficulty]
+        self.current_countdown = self.countdown_seconds
+        self._refresh_static_state()
+
+    def _refresh_static_state(self):
+        """Rebuild the rarely-changing part of get_board_state()."""
+        self._static_state = {
+            "difficulty": self.difficulty.value,
+            "countdown_seconds": self.current_countdown,
+        }
+        self._state_cache = None
 
     def get_countdown_seconds(self) -> int:
         """Get countdown seconds (dynamic, adjusts with wins/losses)."""
@@ -138,32 +253,58 @@ class TicTacToeGame:
         self.board_visible = visible
         if not visible and self.state == GameState.PLAYER_TURN:
             self.state = GameState.INVISIBLE
+        self._state_cache = None
+
+    def _set_cell(self, position: int, mark: Mark):
+        """Place a mark (EMPTY clears the cell) and invalidate the cached state."""
+        bit = 1 << position
+        self.x_bits &= ~bit
+        self.o_bits &= ~bit
+        if mark == Mark.X:
+            self.x_bits |= bit
+        elif mark == Mark.O:
+            self.o_bits |= bit
+        self._state_cache = None
+
+    @property
+    def board(self) -> List[Mark]:
+        """The board as a list of Marks, decoded from the bitboards."""
+        x_bits, o_bits = self.x_bits, self.o_bits
+        return [MARKS[(x_bits >> i & 1) | (o_bits >> i & 1) << 1] for i in range(9)]
 
     def is_position_valid(self, position: int) -> bool:
         """Check if a position is valid and empty."""
-        return 0 <= position < 9 and self.board[position] == Mark.EMPTY
+        return 0 <= position < 9 and not ((self.x_bits | self.o_bits) >> position) & 1
 
     def get_empty_positions(self) -> List[int]:
         """Get all empty positions on the board."""
-        return [i for i in range(9) if self.board[i] == Mark.EMPTY]
+        empty_mask = FULL_BOARD & ~(self.x_bits | self.o_bits)
+        positions = []
+        while empty_mask:
+            lowest = empty_mask & -empty_mask
+            positions.append(lowest.bit_length() - 1)
+            empty_mask ^= lowest
+        return positions
+
+    def _bits_for(self, mark: Mark) -> int:
+        """Get the bitboard holding the specified mark."""
+        return self.x_bits if mark == Mark.X else self.o_bits
+
+    def _find_winning_pattern(self, mark: Mark) -> Optional[Tuple[int, int, int]]:
+        """Get the first winning pattern completed by mark, or None."""
+        bits = self._bits_for(mark)
+        for mask, pattern in WIN_MASKS_AND_PATTERNS:
+            if (bits & mask) == mask:
+                return pattern
+        return None
 
     def check_win(self, mark: Mark) -> bool:
         """Check if the specified mark has won."""
-        for pattern in WIN_PATTERNS:
-            if all(self.board[i] == mark for i in pattern):
-                return True
-        return False
-
-    def get_winning_cells(self, mark: Mark) -> List[int]:
-        """Get the winning cells if mark has won."""
-        for pattern in WIN_PATTERNS:
-            if all(self.board[i] == mark for i in pattern):
-                return pattern
-        return []
+        return is_winning_bits(self._bits_for(mark))
 
     def is_board_full(self) -> bool:
         """Check if the board is full (draw)."""
-        return all(cell != Mark.EMPTY for cell in self.board)
+        return (self.x_bits | self.o_bits) == FULL_BOARD
 
     def player_move(self, position: int) -> MoveResult:
         """Player (X) makes a move."""
@@ -177,15 +318,16 @@ class TicTacToeGame:
             return MoveResult(False, position, Mark.X, message="Invalid position")
 
         # Place the mark
-        self.board[position] = Mark.X
+        self._set_cell(position, Mark.X)
         self.last_move = position
         self.board_visible = True  # Board becomes visible after move
 
-        # Check for win
-        if self.check_win(Mark.X):
+        # Check for win (impossible with fewer than 3 of the mover's marks)
+        pattern = self._find_winning_pattern(Mark.X) if bin(self.x_bits).count("1") >= 3 else None
+        if pattern:
             self.state = GameState.PLAYER_WINS
             self.winner = Mark.X
-            self.winning_cells = self.get_winning_cells(Mark.X)
+            self.winning_cells = list(pattern)
             self._record_game_result(won=True)
             return MoveResult(True, position, Mark.X, self.winning_cells, "You win!")
 
@@ -205,14 +347,15 @@ class TicTacToeGame:
             return MoveResult(False, -1, Mark.O, message="Not computer's turn")
 
         position = self._calculate_best_move()
-        self.board[position] = Mark.O
+        self._set_cell(position, Mark.O)
         self.last_move = position
 
-        # Check for win
-        if self.check_win(Mark.O):
+        # Check for win (impossible with fewer than 3 of the mover's marks)
+        pattern = self._find_winning_pattern(Mark.O) if bin(self.o_bits).count("1") >= 3 else None
+        if pattern:
             self.state = GameState.COMPUTER_WINS
             self.winner = Mark.O
-            self.winning_cells = self.get_winning_cells(Mark.O)
+            self.winning_cells = list(pattern)
             self._record_game_result(won=False)
             return MoveResult(True, position, Mark.O, self.winning_cells, "Computer wins!")
 
@@ -227,43 +370,12 @@ class TicTacToeGame:
         return MoveResult(True, position, Mark.O, message="Your turn!")
 
     def _calculate_best_move(self) -> int:
-        """Simple AI: win, block, center, corner, edge."""
-        empty = self.get_empty_positions()
-
-        # Priority 1: Win if possible
-        for pos in empty:
-            self.board[pos] = Mark.O
-            if self.check_win(Mark.O):
-                self.board[pos] = Mark.EMPTY
-                return pos
-            self.board[pos] = Mark.EMPTY
-
-        # Priority 2: Block player win
-        for pos in empty:
-            self.board[pos] = Mark.X
-            if self.check_win(Mark.X):
-                self.board[pos] = Mark.EMPTY
-                return pos
-            self.board[pos] = Mark.EMPTY
-
-        # Priority 3: Take center
-        if 4 in empty:
-            return 4
-
-        # Priority 4: Take a corner
-        corners = [0, 2, 6, 8]
-        for corner in corners:
-            if corner in empty:
-                return corner
-
-        # Priority 5: Take an edge
-        edges = [1, 3, 5, 7]
-        for edge in edges:
-            if edge in empty:
-                return edge
-
-        # Fallback
-        return empty[0]
+        """Look up the AI reply, searching (and remembering) positions outside BEST_MOVE."""
+        key = (self.x_bits, self.o_bits)
+        move = BEST_MOVE.get(key)
+        if move is None:
+            move = BEST_MOVE[key] = _best_move_core(self.x_bits, self.o_bits)
+        return move
 
     def _record_game_result(self, won: bool, draw: bool = False):
         """Record game result for streak tracking, countdown adjustment, and token rewards."""
@@ -281,12 +393,7 @@ class TicTacToeGame:
                 self.current_countdown -= 1
 
             # Award tokens based on difficulty
-            if self.difficulty == Difficulty.EASY:
-                tokens_earned = TOKEN_REWARDS["win_easy"]
-            elif self.difficulty == Difficulty.MEDIUM:
-                tokens_earned = TOKEN_REWARDS["win_medium"]
-            else:
-                tokens_earned = TOKEN_REWARDS["win_hard"]
+            tokens_earned = _WIN_REWARDS[self.difficulty]
 
             # Streak bonus (extra tokens for consecutive wins)
             if self.win_streak > 1:
@@ -307,20 +414,15 @@ class TicTacToeGame:
         # Add tokens
         self.tokens += tokens_earned
         self.total_tokens_earned += tokens_earned
+        self._refresh_static_state()
 
     def purchase_avatar(self, avatar_id: str) -> dict:
         """Purchase an avatar with tokens."""
-        # Find the avatar
-        avatar = None
-        for a in AVATARS:
-            if a["id"] == avatar_id:
-                avatar = a
-                break
-
+        avatar = _AVATARS_BY_ID.get(avatar_id)
         if not avatar:
             return {"success": False, "message": "Avatar not found"}
 
-        if avatar_id in self.unlocked_avatars:
+        if avatar_id in self._unlocked_set:
             return {"success": False, "message": "Avatar already unlocked"}
 
         if self.tokens < avatar["cost"]:
@@ -329,7 +431,9 @@ class TicTacToeGame:
         # Purchase successful
         self.tokens -= avatar["cost"]
         self.unlocked_avatars.append(avatar_id)
+        self._unlocked_set.add(avatar_id)
         self.current_avatar = avatar_id
+        self._state_cache = None
 
         return {
             "success": True,
@@ -339,18 +443,16 @@ class TicTacToeGame:
 
     def set_avatar(self, avatar_id: str) -> dict:
         """Set the current avatar (must be unlocked)."""
-        if avatar_id not in self.unlocked_avatars:
+        if avatar_id not in self._unlocked_set:
             return {"success": False, "message": "Avatar not unlocked"}
 
         self.current_avatar = avatar_id
+        self._state_cache = None
         return {"success": True, "message": "Avatar changed!"}
 
     def get_current_avatar(self) -> dict:
         """Get the current avatar info."""
-        for avatar in AVATARS:
-            if avatar["id"] == self.current_avatar:
-                return avatar
-        return AVATARS[0]  # Default to egg
+        return _AVATARS_BY_ID.get(self.current_avatar, AVATARS[0])  # Default to egg
 
     def get_shop_data(self) -> dict:
         """Get avatar shop data."""
@@ -362,15 +464,22 @@ class TicTacToeGame:
         }
 
     def get_board_state(self) -> dict:
-        """Get current state as dictionary for JSON serialization."""
+        """Get current state as dictionary for JSON serialization.
+
+        The dict is cached until the next mutation, so callers must not modify it.
+        state_version changes whenever a new dict is built.
+        """
+        if self._state_cache is not None:
+            return self._state_cache
+        self.state_version += 1
         current_avatar = self.get_current_avatar()
-        return {
-            "board": [cell.value for cell in self.board],
+        x_bits, o_bits = self.x_bits, self.o_bits
+        self._state_cache = {
+            "board": [MARK_STR[(x_bits >> i & 1) | (o_bits >> i & 1) << 1] for i in range(9)],
             "state": self.state.value,
-            "difficulty": self.difficulty.value,
-            "countdown_seconds": self.current_countdown,
+            **self._static_state,
             "board_visible": self.board_visible,
-            "winner": self.winner.value if self.winner else None,
+            "winner": MARK_STR[self.winner] if self.winner else None,
             "winning_cells": self.winning_cells,
             "last_move": self.last_move,
             "win_streak": self.win_streak,
@@ -383,9 +492,10 @@ class TicTacToeGame:
             "current_avatar": current_avatar,
             "unlocked_avatars": self.unlocked_avatars,
         }
+        return self._state_cache
 
     def set_board_for_testing(self, positions: List[int], mark: Mark):
         """Set specific positions for testing purposes."""
         for pos in positions:
             if 0 <= pos < 9:
-                self.board[pos] = mark
+                self._set_cell(pos, mark)